@@ -4,127 +4,379 @@ A script to transform wordlists based on custom character replacement rules.
 """
 
 import argparse
+import contextlib
+import functools
+import multiprocessing
+import os
 import sys
 import re
+from collections import namedtuple
+from itertools import chain, islice
+
+# Generated lines are joined into chunks of this many before each write call,
+# and output files are opened with a buffer of this many bytes
+WRITE_BATCH_SIZE = 8192
+OUTPUT_BUFFER_SIZE = 1 << 20
+
+# Wordlists shorter than this are transformed in-process, since starting the
+# worker pool would cost more than it saves; longer ones are sent to the
+# workers in chunks of this many words
+PARALLEL_MIN_WORDS = 10000
+PARALLEL_CHUNK_SIZE = 4096
+
+# Matches the || rule delimiter when it is not escaped with a backslash
+_DELIM_RE = re.compile(r'(?<!\\)\|\|')
+
+# A parsed rule; fields that do not apply to its type are None. compile_ruleset
+# fills in pattern, caseless and char_lower, and adds the fused 'translate'
+# type that uses table, pairs and ascii_table
+Rule = namedtuple("Rule", ["type", "target_type", "char", "instance", "replacement",
+                           "position", "operation", "pattern", "caseless", "char_lower",
+                           "table", "pairs", "ascii_table"],
+                  defaults=(None,) * 12)
+
+class _CaseInsensitiveTable(dict):
+    """
+    A str.translate table for fused case-insensitive 'all' replacements.
+    
+    Both cases of each character are filled in up front. Any other character
+    is checked against the rules' patterns the first time it is seen, so
+    case variants such as 'ſ' for 's' are matched exactly like re.IGNORECASE.
+    """
+    def __init__(self, rules):
+        super().__init__()
+        self.rules = [(rule.pattern, rule.replacement) for rule in rules]
+        for rule in rules:
+            for c in (rule.char.lower(), rule.char.upper()):
+                if len(c) == 1:  # e.g. 'ß'.upper() is 'SS', which IGNORECASE never matches
+                    self[ord(c)] = rule.replacement
+    
+    def __missing__(self, key):
+        value = key  # Characters no rule matches map to themselves
+        for pattern, replacement in self.rules:
+            if pattern.fullmatch(chr(key)):
+                value = replacement
+                break
+        self[key] = value
+        return value
+
+@functools.lru_cache(maxsize=256)
+def _compile_ci_pattern(char):
+    """Return a cached case-insensitive regex matching char literally."""
+    return re.compile(re.escape(char), re.IGNORECASE)
+
+@functools.lru_cache(maxsize=256)
+def _translate_table(pairs):
+    """Return a cached str.translate table for a frozenset of (char, replacement) pairs."""
+    return str.maketrans(dict(pairs))
+
+def _ascii_table(rules, case_insensitive=False):
+    """
+    Return a bytes.translate table equivalent to fusing the rules, or None.
+    
+    This is only possible when every rule maps a single ASCII character to a
+    single ASCII character. For ASCII words it gives the same result as the
+    str table, and bytes.translate is much faster than str.translate.
+    """
+    mapping = {}
+    for rule in rules:
+        char = rule.char
+        replacement = rule.replacement
+        if not (char.isascii() and replacement.isascii() and len(replacement) == 1):
+            return None
+        for c in ((char.lower(), char.upper()) if case_insensitive else (char,)):
+            mapping[c] = replacement
+    return bytes.maketrans("".join(mapping).encode("ascii"),
+                           "".join(mapping.values()).encode("ascii"))
+
+def compile_ruleset(ruleset, case_insensitive=False):
+    """
+    Precompute the per-rule lookup objects used by apply_rules.
+    
+    This is done once per ruleset so they are not rebuilt for every word.
+    Consecutive 'all' replacements of a single character are fused into one
+    str.translate table, so the word is scanned once instead of once per rule.
+    Case-sensitive runs are limited to one-character replacements and only
+    use the table for ASCII words.
+    """
+    compiled = []
+    pending = []  # Fusable 'all' rules waiting to be turned into a table
+    
+    def flush_pending():
+        if len(pending) == 1:
+            compiled.append(pending[0])
+        elif pending:
+            if case_insensitive:
+                compiled.append(Rule("translate", table=_CaseInsensitiveTable(pending),
+                                     ascii_table=_ascii_table(pending, case_insensitive=True)))
+            else:
+                pairs = [(rule.char, rule.replacement) for rule in pending]
+                compiled.append(Rule("translate", table=_translate_table(frozenset(pairs)),
+                                     pairs=pairs, ascii_table=_ascii_table(pending)))
+        pending.clear()
+    
+    for rule in ruleset:
+        if rule.type == "replace" and rule.instance == "all":
+            char = rule.char
+            replacement = rule.replacement
+            if case_insensitive:
+                # Digits and symbols have no other case, so a plain str.replace
+                # does the same job as the regex (backslashes in the replacement
+                # are escapes to re.sub, so those rules keep the regex)
+                caseless = all(c.lower() == c.upper() for c in char) and "\\" not in replacement
+                rule = rule._replace(pattern=_compile_ci_pattern(char), caseless=caseless)
+            
+            # Backslashes are special in re.sub replacements, so leave those
+            # rules to the regex path to keep their behavior unchanged
+            if case_insensitive:
+                fusable = len(char) == 1 and "\\" not in replacement
+            else:
+                # Longer replacements push str.translate off its fast path
+                fusable = len(char) == 1 and len(replacement) == 1
+            if fusable:
+                # A single translate pass is only equivalent to applying the
+                # rules in order if no rule in the run matches a character
+                # that an earlier one wrote or already replaced
+                if case_insensitive:
+                    pattern = rule.pattern
+                    conflict = any(pattern.fullmatch(r.char) or pattern.search(r.replacement)
+                                   for r in pending)
+                else:
+                    conflict = any(char == r.char or char == r.replacement for r in pending)
+                if conflict:
+                    flush_pending()
+                pending.append(rule)
+                continue
+        elif rule.instance is not None and case_insensitive:
+            rule = rule._replace(char_lower=_lowered(rule.char))
+        
+        flush_pending()
+        compiled.append(rule)
+    
+    flush_pending()
+    return compiled
+
+def _find_nth(text, sub, instance):
+    """Return the index of the nth occurrence of sub in text, or -1 if there is none."""
+    find = text.find
+    step = len(sub)
+    pos = -1
+    start = 0
+    for _ in range(instance):
+        pos = find(sub, start)
+        if pos < 0:
+            break
+        start = pos + step
+    return pos
+
+def _lowered(text):
+    """Lowercase text for searching while keeping indexes aligned with the original."""
+    lowered = text.lower()
+    if len(lowered) != len(text):
+        # A few characters (e.g. 'İ') lowercase to more than one character
+        lowered = "".join(c.lower() if len(c.lower()) == 1 else c for c in text)
+    return lowered
 
 def apply_rules(word, rules, case_insensitive=False):
     """
     Apply the specified rules to the word.
     
     If case_insensitive is True, character matching will ignore case.
+    The rules may be a ruleset as parsed or one prepared by compile_ruleset.
     """
     result = word
     for rule in rules:
-        if rule["type"] == "replace":
+        rule_type = rule.type
+        if rule_type == "translate":
+            # Fused single-character 'all' replacements (see compile_ruleset).
+            # For case-sensitive runs str.translate only beats a few
+            # str.replace calls on ASCII text, where it takes its fast path
+            ascii_table = rule.ascii_table
+            pairs = rule.pairs
+            if ascii_table is not None and result.isascii():
+                result = result.encode("ascii").translate(ascii_table).decode("ascii")
+            elif pairs is None or result.isascii():
+                result = result.translate(rule.table)
+            else:
+                for char, replacement in pairs:
+                    result = result.replace(char, replacement)
+        elif rule_type == "replace":
             # Standard replacement rule
-            char = rule["char"]
-            instance = rule["instance"]
-            replacement = rule["replacement"]
+            char = rule.char
+            instance = rule.instance
+            replacement = rule.replacement
             
             if instance == "all":
-                if case_insensitive:
+                if case_insensitive and not rule.caseless:
                     # Case-insensitive replacement for all instances
-                    pattern = re.compile(re.escape(char), re.IGNORECASE)
+                    pattern = rule.pattern or _compile_ci_pattern(char)
                     result = pattern.sub(replacement, result)
                 else:
                     # Case-sensitive replacement
                     result = result.replace(char, replacement)
             else:
-                # Find the nth instance of the character
-                count = 0
-                new_result = ""
-                
+                # Find the nth instance of the character and splice in the replacement
                 if case_insensitive:
-                    # For case-insensitive matching, we'll compare lowercase versions
-                    char_lower = char.lower()
-                    for c in result:
-                        if c.lower() == char_lower:
-                            count += 1
-                            if count == instance:
-                                new_result += replacement
-                            else:
-                                new_result += c
-                        else:
-                            new_result += c
+                    # For case-insensitive matching, search a lowercased copy
+                    char_lower = rule.char_lower or _lowered(char)
+                    pos = _find_nth(_lowered(result), char_lower, instance)
+                    length = len(char_lower)
                 else:
-                    # Case-sensitive matching (original behavior)
-                    for c in result:
-                        if c == char:
-                            count += 1
-                            if count == instance:
-                                new_result += replacement
-                            else:
-                                new_result += c
-                        else:
-                            new_result += c
-                        
-                result = new_result
-        elif rule["type"] == "case_transform":
+                    pos = _find_nth(result, char, instance)
+                    length = len(char)
+                
+                if pos >= 0:
+                    result = result[:pos] + replacement + result[pos + length:]
+        elif rule_type == "case_transform":
             # Case transformation rule (upper/lower)
-            operation = rule["operation"]
+            operation = rule.operation
             
-            if rule["target_type"] == "position":
+            if rule.target_type == "position":
                 # Transform character at specific position
-                position = rule["position"]
+                position = rule.position
                 
                 if position <= len(result):
-                    # Apply the case transformation
-                    chars = list(result)
+                    # Apply the case transformation and splice the character back in
+                    index = position - 1
+                    c = result[index]
+                    if index < 0:
+                        # Positions below 1 count from the end, as list indexing did
+                        index += len(result)
                     if operation == "upper":
-                        chars[position-1] = chars[position-1].upper()
+                        c = c.upper()
                     elif operation == "lower":
-                        chars[position-1] = chars[position-1].lower()
-                    result = ''.join(chars)
+                        c = c.lower()
+                    result = result[:index] + c + result[index + 1:]
             else:  # target_type == "character"
                 # Transform specific instance of a character
-                char = rule["char"]
-                instance = rule["instance"]
+                char = rule.char
+                instance = rule.instance
                 
                 # Find the nth instance of the character
-                count = 0
-                new_result = ""
-                
-                if case_insensitive and char:
-                    # Case-insensitive matching
-                    char_lower = char.lower()
-                    for c in result:
-                        if c.lower() == char_lower:
-                            count += 1
-                            if count == instance:
-                                if operation == "upper":
-                                    new_result += c.upper()
-                                elif operation == "lower":
-                                    new_result += c.lower()
-                            else:
-                                new_result += c
-                        else:
-                            new_result += c
-                elif char:  # Case-sensitive matching
-                    for c in result:
-                        if c == char:
-                            count += 1
-                            if count == instance:
-                                if operation == "upper":
-                                    new_result += c.upper()
-                                elif operation == "lower":
-                                    new_result += c.lower()
-                            else:
-                                new_result += c
-                        else:
-                            new_result += c
+                if case_insensitive:
+                    char_lower = rule.char_lower or _lowered(char)
+                    pos = _find_nth(_lowered(result), char_lower, instance)
+                    end = pos + len(char_lower)
+                else:
+                    pos = _find_nth(result, char, instance)
+                    end = pos + len(char)
                 
-                if count > 0:  # Only update if the character was found
-                    result = new_result
+                if pos >= 0:  # Only update if the character was found
+                    found = result[pos:end]
+                    if operation == "upper":
+                        found = found.upper()
+                    elif operation == "lower":
+                        found = found.lower()
+                    result = result[:pos] + found + result[end:]
     
     return result
 
+def _ruleset_source(rules, case_insensitive, namespace):
+    """
+    Write the body of a function applying the compiled rules, like apply_rules.
+    
+    Objects the code needs are added to namespace under generated names.
+    Small integers are written into the code directly.
+    """
+    lines = []
+    for i, rule in enumerate(rules):
+        def const(name, value):
+            key = f"_{name}{i}"
+            namespace[key] = value
+            return key
+        
+        if rule.type == "translate":
+            # The same (condition, code) choices as apply_rules, in order
+            def translate():
+                return f"result = result.translate({const('table', rule.table)})"
+            
+            branches = []
+            if rule.ascii_table is not None:
+                ascii_table = const("ascii_table", rule.ascii_table)
+                branches.append(("result.isascii()", [
+                    f"result = result.encode('ascii').translate({ascii_table}).decode('ascii')"]))
+            if rule.pairs is None:
+                branches.append((None, [translate()]))
+            else:
+                if rule.ascii_table is None:
+                    branches.append(("result.isascii()", [translate()]))
+                branches.append((None, [
+                    f"result = result.replace({const(f'char{j}_', char)}, "
+                    f"{const(f'replacement{j}_', replacement)})"
+                    for j, (char, replacement) in enumerate(rule.pairs)]))
+            if len(branches) == 1:
+                lines += branches[0][1]
+                continue
+            for j, (condition, code) in enumerate(branches):
+                lines.append("else:" if condition is None else
+                             f"{'if' if j == 0 else 'elif'} {condition}:")
+                lines += [f"    {line}" for line in code]
+        elif rule.type == "replace" and rule.instance == "all":
+            replacement = const("replacement", rule.replacement)
+            if case_insensitive and not rule.caseless:
+                sub = const("sub", (rule.pattern or _compile_ci_pattern(rule.char)).sub)
+                lines.append(f"result = {sub}({replacement}, result)")
+            else:
+                lines.append(f"result = result.replace({const('char', rule.char)}, {replacement})")
+        elif rule.type == "case_transform" and rule.target_type == "position":
+            # Positions below 1 count from the end (see apply_rules)
+            lines += [f"if {rule.position} <= len(result):",
+                      f"    index = {rule.position - 1}",
+                      "    c = result[index]",
+                      "    if index < 0:",
+                      "        index += len(result)",
+                      f"    result = result[:index] + c.{rule.operation}() + result[index + 1:]"]
+        else:  # A nth-instance replacement or case transformation
+            if case_insensitive:
+                char = rule.char_lower or _lowered(rule.char)
+                text = "_lowered(result)"
+            else:
+                char = rule.char
+                text = "result"
+            if rule.instance == 1:
+                lines.append(f"pos = {text}.find({const('char', char)})")
+            else:
+                lines.append(f"pos = _find_nth({text}, {const('char', char)}, {rule.instance})")
+            lines.append("if pos >= 0:")
+            end = f"pos + {len(char)}"
+            if rule.type == "replace":
+                lines.append(f"    result = result[:pos] + {const('replacement', rule.replacement)}"
+                             f" + result[{end}:]")
+            else:
+                lines.append(f"    result = result[:pos] + result[pos:{end}].{rule.operation}()"
+                             f" + result[{end}:]")
+    return lines
+
+@functools.lru_cache(maxsize=256)
+def _ruleset_function(ruleset, case_insensitive):
+    """Build the function for compile_ruleset_to_func, cached per ruleset tuple."""
+    rules = compile_ruleset(ruleset, case_insensitive=case_insensitive)
+    namespace = {"_find_nth": _find_nth, "_lowered": _lowered}
+    lines = _ruleset_source(rules, case_insensitive, namespace)
+    source = "def _transform(result):\n"
+    source += "".join(f"    {line}\n" for line in lines)
+    source += "    return result\n"
+    exec(source, namespace)
+    return namespace["_transform"]
+
+def compile_ruleset_to_func(ruleset, case_insensitive=False):
+    """
+    Return a function that applies the ruleset to one word.
+    
+    The function is generated as straight-line code for this ruleset, so no
+    rule types are dispatched per word. It gives the same results as
+    apply_rules with the compiled ruleset.
+    """
+    return _ruleset_function(tuple(ruleset), case_insensitive)
+
 def split_escaped_delimiters(text, delimiter="||"):
     """Split a string by delimiter, respecting escape sequences."""
     # Use regex to split by delimiter but not when preceded by backslash
     # Using negative lookbehind (?<!\\) to ensure the || is not preceded by \
-    parts = re.split(r'(?<!\\)\|\|', text)
+    parts = _DELIM_RE.split(text)
     # Replace escaped delimiters with the actual delimiter
-    return [part.replace(f"\\{delimiter}", delimiter).strip() for part in parts]
+    escaped = f"\\{delimiter}"
+    return [part.replace(escaped, delimiter).strip() for part in parts]
 
 def parse_single_rule(rule_text):
     """Parse a single rule definition."""
@@ -143,12 +395,8 @@ def parse_single_rule(rule_text):
                 else:
                     operation = "lower"
                 
-                return {
-                    "type": "case_transform",
-                    "target_type": "position",
-                    "position": position,
-                    "operation": operation
-                }
+                return Rule("case_transform", target_type="position",
+                            position=position, operation=operation)
             else:
                 print(f"Warning: Invalid operation: {operation}")
                 return None
@@ -174,13 +422,8 @@ def parse_single_rule(rule_text):
         else:
             try:
                 instance = int(instance_str)
-                return {
-                    "type": "case_transform",
-                    "target_type": "character",
-                    "char": char,
-                    "instance": instance,
-                    "operation": operation
-                }
+                return Rule("case_transform", target_type="character",
+                            char=char, instance=instance, operation=operation)
             except ValueError:
                 print(f"Warning: Invalid instance value: {instance_str}")
                 return None
@@ -192,21 +435,11 @@ def parse_single_rule(rule_text):
         replacement = parts[2]
         
         if instance.lower() == "all":
-            return {
-                "type": "replace",
-                "char": char,
-                "instance": "all",
-                "replacement": replacement
-            }
+            return Rule("replace", char=char, instance="all", replacement=replacement)
         else:
             try:
                 instance = int(instance)
-                return {
-                    "type": "replace",
-                    "char": char,
-                    "instance": instance,
-                    "replacement": replacement
-                }
+                return Rule("replace", char=char, instance=instance, replacement=replacement)
             except ValueError:
                 print(f"Warning: Invalid instance value: {instance}")
                 return None
@@ -214,6 +447,14 @@ def parse_single_rule(rule_text):
         print(f"Warning: Invalid rule format: {rule_text}")
         return None
 
+def _describe_rule(rule):
+    """Return the rule written back in rule file syntax."""
+    if rule.type == "case_transform":
+        if rule.target_type == "position":
+            return f"pos {rule.position} {rule.operation}"
+        return f"{rule.char} {rule.instance} {rule.operation}"
+    return f"{rule.char} {rule.instance} {rule.replacement}"
+
 def read_rules(rule_file):
     """Read rules from a file, treating each line as a separate ruleset."""
     rulesets = []
@@ -243,6 +484,62 @@ def read_rules(rule_file):
     
     return rulesets
 
+def read_words(wordlist_file):
+    """Yield the words of a wordlist one at a time instead of loading the whole file."""
+    with open(wordlist_file, "r") as f:
+        for line in f:
+            yield line.strip()
+
+def transform_words(words, ruleset, case_insensitive=False):
+    """Yield (original, transformed) pairs, compiling the ruleset once for all words."""
+    transform = compile_ruleset_to_func(ruleset, case_insensitive=case_insensitive)
+    for word in words:
+        yield word, transform(word)
+
+def transform_words_grouped(words, rulesets, case_insensitive=False):
+    """Yield (original, transformed, ruleset number) for every ruleset applied to each word in turn."""
+    transforms = [compile_ruleset_to_func(ruleset, case_insensitive=case_insensitive)
+                  for ruleset in rulesets]
+    for word in words:
+        for idx, transform in enumerate(transforms, 1):
+            yield word, transform(word), idx
+
+# Ruleset functions compiled by _init_worker in each worker process
+_worker_state = {}
+
+def _init_worker(rulesets, case_insensitive):
+    """Compile every ruleset once when a worker process starts."""
+    _worker_state["transforms"] = [compile_ruleset_to_func(ruleset, case_insensitive=case_insensitive)
+                                   for ruleset in rulesets]
+
+def _transform_word(ruleset_index, word):
+    """Return the (original, transformed) pair for word inside a worker process."""
+    return word, _worker_state["transforms"][ruleset_index](word)
+
+def _transform_word_grouped(word):
+    """Return the (original, transformed, ruleset number) triples for word inside a worker process."""
+    return [(word, transform(word), idx)
+            for idx, transform in enumerate(_worker_state["transforms"], 1)]
+
+def batched(iterable, size=WRITE_BATCH_SIZE):
+    """Yield successive lists of up to size items from iterable."""
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+def _positive_int(value):
+    """argparse type for a whole number of at least 1."""
+    try:
+        number = int(value)
+    except ValueError:
+        number = 0
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be a whole number of at least 1, got '{value}'")
+    return number
+
 def main():
     parser = argparse.ArgumentParser(description="Apply rules to a wordlist.")
     parser.add_argument("--wordlist", "-w", help="The wordlist file")
@@ -252,12 +549,24 @@ def main():
                         help="Include detailed transformation information in output")
     parser.add_argument("--case-insensitive", "-i", action="store_true",
                         help="Make character matching case-insensitive")
+    parser.add_argument("--jobs", "-j", type=_positive_int,
+                        help="Number of worker processes (default: one per CPU, 1 disables)")
+    parser.add_argument("--group-by-word", action="store_true",
+                        help="Output all transformations of each word together instead of grouping by ruleset")
     args = parser.parse_args()
     
-    # Read wordlist
+    # A regular file is streamed from disk again for each ruleset. Anything
+    # else (a pipe, /dev/stdin, a FIFO) can only be read once, so its words
+    # are read into memory here instead
     try:
-        with open(args.wordlist, "r") as f:
-            words = [word.strip() for word in f.readlines()]
+        if os.path.isfile(args.wordlist):
+            # Opening it now still reports an unreadable file before any
+            # rules are entered interactively
+            with open(args.wordlist, "r"):
+                pass
+            cached_words = None
+        else:
+            cached_words = list(read_words(args.wordlist))
     except FileNotFoundError:
         print(f"Error: Wordlist file '{args.wordlist}' not found.")
         sys.exit(1)
@@ -295,91 +604,131 @@ def main():
             if ruleset:
                 rulesets.append(ruleset)
     
-    # Apply each ruleset to all words
-    all_generated_words = []
-    ruleset_descriptions = []
+    # Create a description of each ruleset for output
+    ruleset_descriptions = [" || ".join([_describe_rule(rule) for rule in ruleset])
+                            for ruleset in rulesets]
     
-    for ruleset_index, ruleset in enumerate(rulesets, 1):
-        # Create a description of this ruleset for output
-        ruleset_desc = []
-        for rule in ruleset:
-            if rule["type"] == "replace":
-                char = rule["char"]
-                instance = rule["instance"]
-                replacement = rule["replacement"]
-                ruleset_desc.append(f"{char} {instance} {replacement}")
-            elif rule["type"] == "case_transform":
-                operation = rule["operation"]
-                if rule["target_type"] == "position":
-                    position = rule["position"]
-                    ruleset_desc.append(f"pos {position} {operation}")
-                else:  # target_type == "character"
-                    char = rule["char"]
-                    instance = rule["instance"]
-                    ruleset_desc.append(f"{char} {instance} {operation}")
-        
-        ruleset_description = " || ".join(ruleset_desc)
-        ruleset_descriptions.append(ruleset_description)
-        
-        # Apply this ruleset to each word
-        for word in words:
-            new_word = apply_rules(word, ruleset, case_insensitive=args.case_insensitive)
-            all_generated_words.append({
-                "original": word,
-                "transformed": new_word,
-                "ruleset_index": ruleset_index,
-                "ruleset": ruleset_description
-            })
-    
-    # Output results
-    if args.output:
-        try:
-            with open(args.output, "w") as f:
-                # If detail flag is set, include ruleset information
-                if args.detail:
-                    # Write header with ruleset information
-                    f.write("# Generated words by ruleset:\n")
-                    for idx, desc in enumerate(ruleset_descriptions, 1):
-                        f.write(f"# Ruleset {idx}: {desc}\n")
-                    f.write("#\n")
-                    
-                    # Write all generated words with original word and ruleset info
-                    for item in all_generated_words:
-                        f.write(f"{item['transformed']} | Ruleset {item['ruleset_index']}\n")
-                else:
-                    # Just write the transformed words without additional info
-                    for item in all_generated_words:
-                        f.write(f"{item['transformed']}\n")
-                
-                # Only create summary file if detail flag is set
-                if args.detail:
-                    summary_file = args.output + ".summary.txt"
-                    with open(summary_file, "w") as sf:
-                        sf.write("Original Word | Transformed Word | Ruleset\n")
-                        sf.write("------------- | --------------- | ------\n")
-                        for item in all_generated_words:
-                            sf.write(f"{item['original']} | {item['transformed']} | {item['ruleset']}\n")
-                    print(f"Generated words written to {args.output}")
-                    print(f"Summary information written to {summary_file}")
-                else:
-                    print(f"Generated words written to {args.output}")
-        except Exception as e:
-            print(f"Error writing to output file: {e}")
+    # Spread the words over worker processes if the wordlist is big enough
+    parallel = False
+    if (args.jobs or os.cpu_count() or 1) > 1:
+        # Only regular files are read again to count; other wordlists are
+        # already in memory and must not be consumed before they are transformed
+        if cached_words is None:
+            word_count = sum(1 for _ in islice(read_words(args.wordlist), PARALLEL_MIN_WORDS))
+        else:
+            word_count = len(cached_words)
+        parallel = word_count >= PARALLEL_MIN_WORDS
+    if parallel:
+        pool_context = multiprocessing.Pool(args.jobs, initializer=_init_worker,
+                                            initargs=(rulesets, args.case_insensitive))
     else:
-        # Print to console - adjust format based on detail flag
-        if args.detail:
-            for idx, desc in enumerate(ruleset_descriptions, 1):
-                print(f"\nRuleset {idx}: {desc}")
+        pool_context = contextlib.nullcontext()
+    
+    # Apply each ruleset to all words, writing results as they are generated
+    # rather than collecting them all in memory first
+    def wordlist():
+        return read_words(args.wordlist) if cached_words is None else cached_words
+    
+    def generated_words(ruleset_index):
+        words = wordlist()
+        if pool is None:
+            return transform_words(words, rulesets[ruleset_index],
+                                   case_insensitive=args.case_insensitive)
+        # imap returns results in wordlist order, so the output is unchanged
+        return pool.imap(functools.partial(_transform_word, ruleset_index), words,
+                         chunksize=PARALLEL_CHUNK_SIZE)
+    
+    def grouped_batches():
+        """Yield batches of (original, transformed, ruleset number) for --group-by-word."""
+        # Each word goes through every ruleset before the next word is read
+        words = wordlist()
+        if pool is None:
+            triples = transform_words_grouped(words, rulesets,
+                                              case_insensitive=args.case_insensitive)
+        else:
+            triples = chain.from_iterable(pool.imap(_transform_word_grouped, words,
+                                                    chunksize=PARALLEL_CHUNK_SIZE))
+        return batched(triples)
+    
+    # Leaving the block shuts the pool down, also when writing fails or is interrupted
+    with pool_context as pool:
+        if args.output:
+            try:
+                with open(args.output, "w", buffering=OUTPUT_BUFFER_SIZE) as f:
+                    # If detail flag is set, include ruleset information
+                    if args.detail:
+                        # The summary file is written alongside the output
+                        summary_file = args.output + ".summary.txt"
+                        with open(summary_file, "w", buffering=OUTPUT_BUFFER_SIZE) as sf:
+                            # Write header with ruleset information
+                            f.write("# Generated words by ruleset:\n")
+                            for idx, desc in enumerate(ruleset_descriptions, 1):
+                                f.write(f"# Ruleset {idx}: {desc}\n")
+                            f.write("#\n")
+                            
+                            sf.write("Original Word | Transformed Word | Ruleset\n")
+                            sf.write("------------- | --------------- | ------\n")
+                            
+                            # Write all generated words with original word and ruleset info
+                            if args.group_by_word:
+                                for batch in grouped_batches():
+                                    f.write("".join([f"{new_word} | Ruleset {idx}\n"
+                                                     for _, new_word, idx in batch]))
+                                    sf.write("".join([f"{word} | {new_word} | {ruleset_descriptions[idx - 1]}\n"
+                                                      for word, new_word, idx in batch]))
+                            else:
+                                for idx in range(1, len(rulesets) + 1):
+                                    desc = ruleset_descriptions[idx - 1]
+                                    for batch in batched(generated_words(idx - 1)):
+                                        f.write("".join([f"{new_word} | Ruleset {idx}\n"
+                                                         for _, new_word in batch]))
+                                        sf.write("".join([f"{word} | {new_word} | {desc}\n"
+                                                          for word, new_word in batch]))
+                        print(f"Generated words written to {args.output}")
+                        print(f"Summary information written to {summary_file}")
+                    else:
+                        # Just write the transformed words without additional info
+                        if args.group_by_word:
+                            for batch in grouped_batches():
+                                f.write("".join([f"{new_word}\n" for _, new_word, _ in batch]))
+                        else:
+                            for idx in range(len(rulesets)):
+                                for batch in batched(generated_words(idx)):
+                                    f.write("".join([f"{new_word}\n" for _, new_word in batch]))
+                        print(f"Generated words written to {args.output}")
+            except OSError as e:
+                # Only I/O errors; a rule that fails while streaming should not be
+                # reported as a write error
+                print(f"Error writing to output file: {e}")
+        else:
+            # Print to console - adjust format based on detail flag
+            if args.detail and args.group_by_word:
+                # Rulesets change from line to line, so list them once up front
+                for idx, desc in enumerate(ruleset_descriptions, 1):
+                    print(f"Ruleset {idx}: {desc}")
                 print("-" * 40)
                 
-                # Print words for this ruleset with details
-                for item in all_generated_words:
-                    if item["ruleset_index"] == idx:
-                        print(f"{item['original']} -> {item['transformed']}")
-        else:
-            # Just print the transformed words
-            for item in all_generated_words:
-                print(item['transformed'])
+                for batch in grouped_batches():
+                    sys.stdout.write("".join([f"{word} -> {new_word} | Ruleset {idx}\n"
+                                              for word, new_word, idx in batch]))
+            elif args.detail:
+                for idx in range(1, len(rulesets) + 1):
+                    print(f"\nRuleset {idx}: {ruleset_descriptions[idx - 1]}")
+                    print("-" * 40)
+                    
+                    # Print words for this ruleset with details
+                    for batch in batched(generated_words(idx - 1)):
+                        sys.stdout.write("".join([f"{word} -> {new_word}\n"
+                                                  for word, new_word in batch]))
+            else:
+                # Just print the transformed words
+                if args.group_by_word:
+                    for batch in grouped_batches():
+                        sys.stdout.write("".join([f"{new_word}\n" for _, new_word, _ in batch]))
+                else:
+                    for idx in range(len(rulesets)):
+                        for batch in batched(generated_words(idx)):
+                            sys.stdout.write("".join([f"{new_word}\n" for _, new_word in batch]))
 
 if __name__ == "__main__":
     main()